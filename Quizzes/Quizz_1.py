@@ -56,4 +56,60 @@ def sum_powers(n):
     backtrack(n, [], 0, base, power, power)
     return sorted(res)
 
-print(sum_powers(500))
\ No newline at end of file
+print(sum_powers(500))
+
+
+# sum_powers for large n (tens of thousands): a table of powers, a counting DP and a lazy generator
+
+# power_table(n) lists every power base^power <= n once, as (value, base, power) sorted by value.
+# count_sum_powers(n) counts the solutions of sum_powers(n) without building them: a 0/1 knapsack over the table.
+# iter_sum_powers(n) yields the same strings as sum_powers(n), in the same sorted order, one at a time.
+# It picks terms in the lexicographic order of their strings, so each path is already sorted and the paths come out sorted
+# (" " is smaller than any digit or "^", so a term that is a prefix of another one also sorts first in the joined string).
+# reachable[i] is a bitset of the sums that terms[i:] can still make, so no branch is explored unless it ends in a solution.
+
+def power_table(n):
+    table = []
+    base = 2
+    while base * base <= n:
+        value, power = base * base, 2
+        while value <= n:
+            table.append((value, base, power))
+            value *= base
+            power += 1
+        base += 1
+    return sorted(table)
+
+def count_sum_powers(n):
+    if n < 4:
+        return 0
+    ways = [1] + [0] * n  # ways[s] = number of subsets of the powers seen so far that sum to s
+    for value, _, _ in power_table(n):
+        # the slices are copies, so each power is used at most once
+        ways[value:] = [a + b for a, b in zip(ways[value:], ways[:n + 1 - value])]
+    return ways[n]
+
+def iter_sum_powers(n):
+    if n < 4:
+        return
+    terms = sorted((f"{base}^{power}", value) for value, base, power in power_table(n))
+    size = n // 8 + 1
+    reachable = [(1).to_bytes(size, 'little')] * (len(terms) + 1)
+    sums, mask = 1, (1 << (n + 1)) - 1
+    for i in range(len(terms) - 1, -1, -1):
+        sums |= (sums << terms[i][1]) & mask
+        reachable[i] = sums.to_bytes(size, 'little')
+
+    def backtrack(i, remaining, path):
+        if remaining == 0:  # found a valid solution
+            yield " + ".join(path)
+            return
+        for j in range(i, len(terms)):
+            name, value = terms[j]
+            rest = remaining - value
+            if rest >= 0 and reachable[j + 1][rest >> 3] >> (rest & 7) & 1:
+                path.append(name)
+                yield from backtrack(j + 1, rest, path)
+                path.pop()
+
+    yield from backtrack(0, n, [])
\ No newline at end of file
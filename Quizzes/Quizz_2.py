@@ -19,6 +19,14 @@
 # print(solve('input3.txt')) -> NO
 
 from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import numpy as np
 
 def solve(file_name):
     maze = []
@@ -63,4 +71,134 @@ def solve(file_name):
     frontier = deque([(start_position, 0, 1)])  # initialize frontier with start position, move count, step size, and path
     return bfs(end_position, frontier)
 
-print(solve('./input1.txt'))  # Example usage
\ No newline at end of file
+# Jump-table engine for large grids (far beyond 300x300, eg 5000x5000)
+
+# The move sizes cycle 1, 2, 3, so every state reached after m moves takes a step of m % 3 + 1 next.
+# That means a BFS level is just a set of cells, and the state (row, col, step) becomes the integer pair (step - 1, cell).
+# The grid is parsed once into a flat byte array, padded with 3 walls on every side so that no move can leave it.
+# For every cell and direction we precompute how far (up to 3) we can move before hitting a wall, packed in one byte
+# per cell (2 bits per direction), so checking a move is a shift and a comparison, and each BFS level is expanded
+# with whole-array operations. Cells reached again are dropped with the visited mask, without sorting the level.
+
+PAD = 3
+
+def parse_maze(file_name):
+    with open(file_name, 'rb') as f:  # read the whole file at once
+        rows, cols = map(int, f.readline().split())
+        lines = f.read().split()[:rows]
+    width = cols + 2 * PAD
+    grid = np.full((rows + 2 * PAD, width), ord('#'), dtype=np.uint8)
+    grid[PAD:PAD + rows, PAD:PAD + cols] = np.frombuffer(b''.join(lines), dtype=np.uint8).reshape(rows, cols)
+    return grid.ravel(), width
+
+def shifted(a, offset):
+    # shifted(a, offset)[i] == a[i + offset], with zeros past the ends
+    result = np.zeros_like(a)
+    if offset > 0:
+        result[:-offset] = a[offset:]
+    else:
+        result[-offset:] = a[:offset]
+    return result
+
+def jump_tables(grid, offsets):
+    # (reach[i] >> 2 * d) & 3 = how many squares (up to 3) we can move from i in direction d before hitting a wall
+    free = grid != ord('#')
+    reach = np.zeros(len(grid), dtype=np.uint8)
+    for d, offset in enumerate(offsets):
+        run = np.ones(len(grid), dtype=bool)
+        for k in range(1, 4):
+            run &= shifted(free, k * offset)
+            reach += run.astype(np.uint8) << 2 * d
+    return reach
+
+def solve_fast(file_name):
+    grid, width = parse_maze(file_name)
+    starts, ends = np.flatnonzero(grid == ord('S')), np.flatnonzero(grid == ord('E'))
+    if not len(starts) or not len(ends):  # check if the start and end positions are valid
+        return 'NO'
+    start, end = starts[0], ends[0]
+    offsets = [1, width, -1, -width]
+    reach = jump_tables(grid, offsets)
+
+    offsets, shifts = np.array(offsets)[:, None], np.array([0, 2, 4, 6], dtype=np.uint8)[:, None]
+    visited = np.zeros((3, len(grid)), dtype=bool)  # visited[step - 1][cell]
+    visited[0, start] = True
+    slot = np.zeros(len(grid), dtype=np.int64)  # scratch space to drop repeated cells from a level
+    frontier = np.array([start])
+    moves = 0
+    while len(frontier):
+        step = moves % 3 + 1
+        moving = (reach[frontier] >> shifts) & 3 >= step  # moving[d][i]: frontier[i] can move in direction d
+        landed = (frontier + step * offsets)[moving]
+        moves += 1
+        landed = landed[~visited[step % 3, landed]]
+        # a cell reached from several cells is kept only once: the one position whose index survives in slot
+        positions = np.arange(len(landed))
+        slot[landed] = positions
+        frontier = landed[slot[landed] == positions]
+        visited[step % 3, frontier] = True
+        if visited[step % 3, end]:  # solution found
+            return moves
+    return 'NO'
+
+# Batch mode: solve many maze files across a process pool
+
+# Files are listed lazily from a directory (all its .txt files) or a glob pattern, and at most max_in_flight
+# of them are submitted at a time, so memory stays flat however many files there are.
+# Each result is written as one JSON line as soon as it completes (so not in input order), with the time it took.
+
+def maze_files(target):
+    if os.path.isdir(target):
+        return glob.iglob(os.path.join(glob.escape(target), '*.txt'))
+    return glob.iglob(target)
+
+def timed_solve(file_name, solver=solve_fast):
+    start = time.perf_counter()
+    try:
+        record = {'file': file_name, 'result': solver(file_name)}
+    except Exception as error:  # a broken file should not stop the whole batch
+        record = {'file': file_name, 'error': repr(error)}
+    record['seconds'] = round(time.perf_counter() - start, 6)
+    return record
+
+def solve_batch(target, output=sys.stdout, workers=None, max_in_flight=None, solver=solve_fast):
+    workers = workers or os.cpu_count()
+    max_in_flight = max_in_flight or 2 * workers
+    solved = 0
+
+    def write(futures):
+        for future in futures:
+            output.write(json.dumps(future.result()) + '\n')
+        output.flush()
+        return len(futures)
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = set()
+        for file_name in maze_files(target):
+            if len(pending) >= max_in_flight:  # wait for a free slot before submitting more work
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                solved += write(done)
+            pending.add(pool.submit(timed_solve, file_name, solver))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            solved += write(done)
+    return solved
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solve 1-2-3 step maze files, writing one JSON line per file.')
+    parser.add_argument('target', nargs='?', help='a directory of maze files or a glob pattern')
+    parser.add_argument('-o', '--output', help='JSON-lines output file (default: standard output)')
+    parser.add_argument('-w', '--workers', type=int, help='number of worker processes (default: all cores)')
+    parser.add_argument('--max-in-flight', type=int, help='files submitted at once (default: 2 per worker)')
+    parser.add_argument('--slow', action='store_true', help='use solve instead of solve_fast')
+    args = parser.parse_args()
+
+    if args.target is None:
+        print(solve('./input1.txt'))  # Example usage
+    else:
+        solver = solve if args.slow else solve_fast
+        if args.output:
+            with open(args.output, 'w') as output:
+                solve_batch(args.target, output, args.workers, args.max_in_flight, solver)
+        else:
+            solve_batch(args.target, sys.stdout, args.workers, args.max_in_flight, solver)
\ No newline at end of file
@@ -87,3 +87,158 @@ def smallest_unique_letters(s):
 
 print(smallest_unique_letters("bcabc"))
 print(smallest_unique_letters("thesqtitxyetpxloeevdeqifkz"))
+
+
+# Large inputs: streaming and external-memory versions of the three greedy functions
+
+import heapq
+import os
+import pickle
+import random
+import tempfile
+import time
+
+# smallest_unique_letters_stream reads its input twice, as chunks of text, so the string never has to be in memory.
+# The first pass counts the letters; the second keeps a monotonic stack: a letter on top of the stack is popped
+# when a smaller letter arrives and the letter still appears later (its remaining count is not zero), in O(n) total.
+# stream is a function that returns a new iterable of text chunks each time it is called, eg lambda: read_chunks(file_name).
+# read_chunks drops the whitespace of the file (eg its line endings), so it is not counted as letters.
+# (The result always has every letter of s exactly once: on inputs like "ddbdcdacbbc" smallest_unique_letters can drop a letter.)
+
+def read_chunks(file_name, size=1 << 16):
+    with open(file_name) as f:
+        while chunk := f.read(size):
+            yield ''.join(chunk.split())
+
+def smallest_unique_letters_stream(stream):
+    remaining = {}
+    for chunk in stream():
+        for letter in chunk:
+            remaining[letter] = remaining.get(letter, 0) + 1
+
+    solution = []
+    in_solution = set()
+    for chunk in stream():
+        for letter in chunk:
+            remaining[letter] -= 1
+            if letter in in_solution:
+                continue
+            while solution and solution[-1] > letter and remaining[solution[-1]] > 0:
+                in_solution.remove(solution.pop())
+            solution.append(letter)
+            in_solution.add(letter)
+    return ''.join(solution)
+
+def smallest_unique_letters_fast(s):
+    return smallest_unique_letters_stream(lambda: [s])
+
+# a text file with line endings, read in chunks smaller than its lines
+with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as letters_file:
+    letters_file.write("cbacd\ncbc\n")
+assert smallest_unique_letters_stream(lambda: read_chunks(letters_file.name, size=3)) == "acdb"
+os.remove(letters_file.name)
+
+
+# external_sorted sorts an iterable too big for memory: it sorts chunks of chunk_size records, spills each sorted
+# chunk (a "run") to a temporary file, and lazily merges the runs with a k-way merge (heapq.merge).
+# max_tasks_external and min_lazer_shots_external run the same greedy algorithms as max_tasks and min_lazer_shots
+# over the merged streams, so they accept any iterables (eg read_numbers(file_name), read_pairs(file_name)) and
+# never hold more than one chunk in memory.
+
+def read_numbers(file_name):
+    with open(file_name) as f:
+        for line in f:
+            if line.strip():
+                yield int(line)
+
+def read_pairs(file_name):
+    with open(file_name) as f:
+        for line in f:
+            if line.strip():
+                x0, x1 = line.replace(',', ' ').split()
+                yield int(x0), int(x1)
+
+def write_run(records, block=4096):
+    run = tempfile.TemporaryFile()
+    for i in range(0, len(records), block):
+        pickle.dump(records[i:i + block], run, pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+def read_run(run):
+    with run:
+        while True:
+            try:
+                yield from pickle.load(run)
+            except EOFError:
+                return
+
+def external_sorted(records, key=None, chunk_size=1_000_000):
+    runs = []
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            chunk.sort(key=key)
+            runs.append(write_run(chunk))
+            chunk = []
+    chunk.sort(key=key)
+    if not runs:  # everything fit in one chunk
+        yield from chunk
+        return
+    runs.append(write_run(chunk))
+    yield from heapq.merge(*map(read_run, runs), key=key)
+
+def max_tasks_external(tasks, teams, chunk_size=1_000_000):
+    teams = external_sorted(teams, chunk_size=chunk_size)
+    team = next(teams, None)
+    assigned_tasks = 0
+    for task in external_sorted(tasks, chunk_size=chunk_size):
+        while team is not None and team < task:  # this team can't do this task, or any larger one
+            team = next(teams, None)
+        if team is None:  # no teams left
+            break
+        assigned_tasks += 1
+        team = next(teams, None)
+    return assigned_tasks
+
+def min_lazer_shots_external(intervals, chunk_size=1_000_000):
+    shots = 0
+    last_shot = None
+    for start, end in external_sorted(intervals, key=lambda x: x[0], chunk_size=chunk_size):
+        if last_shot is None or start > last_shot:  # a new shot, as far right as this ship allows
+            shots += 1
+            last_shot = end
+        else:
+            last_shot = min(last_shot, end)
+    return shots
+
+
+# Throughput benchmarks (records per second), with seeded random inputs
+
+def benchmark_greedy(n=10**6, letters=10**4, chunk_size=10**5, seed=0):
+    rnd = random.Random(seed)
+
+    def throughput(name, count, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+        print(f"{name:>34}: {count / seconds:12,.0f} records/s  ({result if isinstance(result, int) else len(result)})")
+
+    tasks = [rnd.randint(1, 10**6) for _ in range(n)]
+    teams = [rnd.randint(1, 10**6) for _ in range(n)]
+    throughput("max_tasks", 2 * n, max_tasks, tasks[:], teams[:])
+    throughput("max_tasks_external", 2 * n, max_tasks_external, iter(tasks), iter(teams), chunk_size)
+
+    ships = [sorted((rnd.randint(0, 10**7), rnd.randint(0, 10**7))) for _ in range(n)]
+    throughput("min_lazer_shots", n, min_lazer_shots, ships[:])
+    throughput("min_lazer_shots_external", n, min_lazer_shots_external, iter(ships), chunk_size)
+
+    s = ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(letters))
+    throughput("smallest_unique_letters", letters, smallest_unique_letters, s)
+    throughput("smallest_unique_letters_fast", letters, smallest_unique_letters_fast, s)
+    throughput("smallest_unique_letters_fast (x100)", 100 * letters, smallest_unique_letters_fast, s * 100)
+
+if __name__ == '__main__':
+    print(smallest_unique_letters_fast("thesqtitxyetpxloeevdeqifkz"))
+    benchmark_greedy()
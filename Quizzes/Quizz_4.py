@@ -62,3 +62,178 @@ def min_win_game(n):
     return dp[1][n]
 
 print(min_win_game(100))
+
+# For n in the thousands: an O(n^2) version of min_win_game that also returns the optimal strategy.
+
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import time
+
+def min_win_game_fast(n):
+    """
+    This function calculates the same minimum amount of money as min_win_game, in O(n^2) time.
+
+    For a range i..j, guessing k costs k + max(dp[i][k-1], dp[k+1][j]). The left part grows with k and the
+    right part shrinks, so let k0 be the smallest k where the left part is at least the right part.
+    Guesses k >= k0 cost k + dp[i][k-1], which is smallest at k0. Guesses k < k0 cost k + dp[k+1][j], and
+    their minimum over the window i..k0-1 is kept in a monotone deque: for a fixed j, k0 only moves left as
+    i decreases, so the window slides left. The table is stored by columns, col[j][i] = dp[i][j], in compact
+    integer arrays, together with the best guess for every range.
+
+    :param n: The upper limit of the range
+    :return: A tuple (minimum amount of money needed, guess table), where guess[j][i] is the best guess for i..j
+    """
+    col = [array('i', bytes(4 * (j + 2))) for j in range(n + 1)]  # col[j][i] = dp[i][j], and dp[j+1][j] = 0
+    guess = [array('i', bytes(4 * (j + 2))) for j in range(n + 1)]
+    for j in range(1, n + 1):
+        right = col[j]
+        guess[j][j] = j
+        k0 = j
+        window = deque()  # (k, k + dp[k+1][j]) for k in i..k0-1, with values decreasing from left to right
+        for i in range(j - 1, 0, -1):
+            value = i + right[i + 1]
+            while window and window[0][1] >= value:
+                window.popleft()
+            window.appendleft((i, value))
+            while k0 > i and col[k0 - 2][i] >= right[k0]:  # k0 - 1 also has the left part >= the right part
+                k0 -= 1
+            while window and window[-1][0] >= k0:
+                window.pop()
+            best, cost = k0, k0 + col[k0 - 1][i]
+            if window and window[-1][1] < cost:
+                best, cost = window[-1]
+            right[i], guess[j][i] = cost, best
+    return col[n][1] if n > 0 else 0, guess
+
+def strategy_tree(guess, i, j):
+    """
+    This function builds the optimal guessing strategy for the range i..j from the guess table of min_win_game_fast.
+
+    :param guess: The guess table returned by min_win_game_fast
+    :param i: The smallest possible winning number
+    :param j: The largest possible winning number
+    :return: None for an empty range, otherwise a tuple (guess, strategy if smaller, strategy if larger)
+    """
+    trees = {}
+    stack = [(i, j)]  # built without recursion, children before parents
+    while stack:
+        a, b = stack[-1]
+        if a > b:
+            trees[a, b] = None
+            stack.pop()
+            continue
+        k = guess[b][a]
+        missing = [r for r in ((a, k - 1), (k + 1, b)) if r not in trees]
+        if missing:
+            stack.extend(missing)
+        else:
+            stack.pop()
+            trees[a, b] = (k, trees.pop((a, k - 1)), trees.pop((k + 1, b)))
+    return trees[i, j]
+
+def strategy_cost(tree):
+    """
+    This function calculates the money needed to always win by following a strategy tree.
+
+    :param tree: A strategy tree returned by strategy_tree
+    :return: The money paid in the worst case over all winning numbers
+    """
+    if tree is None or tree[1] is tree[2] is None:
+        return 0
+    return tree[0] + max(strategy_cost(tree[1]), strategy_cost(tree[2]))
+
+def benchmark_min_win_game(sizes=range(1, 61), timed=(50, 100, 200)):
+    """
+    This function checks min_win_game_fast and its strategy tree against min_win_game for small n, and times both.
+
+    :param sizes: The values of n to check
+    :param timed: The values of n to time
+    """
+    def seconds(function, n):
+        start = time.perf_counter()
+        function(n)
+        return time.perf_counter() - start
+
+    for n in sizes:
+        cost, guess = min_win_game_fast(n)
+        assert cost == min_win_game(n), n
+        assert strategy_cost(strategy_tree(guess, 1, n)) == cost, n
+    for n in timed:
+        print(f"n={n}: min_win_game {seconds(min_win_game, n):.3f}s, min_win_game_fast {seconds(min_win_game_fast, n):.3f}s")
+
+# For long strings (eg 50k characters): ins_to_palin with linear memory, bit-parallel, and in batches across cores.
+
+def ins_to_palin_linear(s):
+    """
+    This function calculates the same minimum number of insertions as ins_to_palin, keeping a single row of the table.
+
+    The table is filled from the last row up, and row i only needs row i + 1, so one row is updated in place:
+    before the update row[j] is dp[i+1][j], after it is dp[i][j], and diag keeps the old row[j-1] = dp[i+1][j-1].
+
+    :param s: The input string
+    :return: The minimum number of insertions needed
+    """
+    n = len(s)
+    row = [0] * n
+    for i in range(n - 1, -1, -1):
+        diag = 0  # dp[i+1][i] = 0, the empty string
+        row[i] = 1
+        letter = s[i]
+        for j in range(i + 1, n):
+            old = row[j]
+            if s[j] == letter:
+                row[j] = diag + 2
+            elif row[j - 1] > old:
+                row[j] = row[j - 1]
+            diag = old
+    return n - row[n - 1] if n else 0
+
+def lcs_length_bits(a, b):
+    """
+    This function calculates the length of the longest common subsequence of a and b, bit-parallel.
+
+    The row of the LCS table for each letter of b is encoded in the bits of one (big) integer v, with a zero
+    bit wherever the row grows by one, so each letter of b is processed with a few whole-integer operations.
+
+    :param a: The first string
+    :param b: The second string
+    :return: The length of the longest common subsequence
+    """
+    m = len(a)
+    full = (1 << m) - 1
+    backwards = a[::-1]
+    matches = {letter: int(''.join('1' if x == letter else '0' for x in backwards), 2) for letter in set(a)}
+    v = full
+    for letter in b:
+        u = v & matches.get(letter, 0)
+        v = ((v + u) | (v - u)) & full
+    return m - v.bit_count()
+
+def ins_to_palin_bits(s):
+    """
+    This function calculates the same minimum number of insertions as ins_to_palin, using lcs_length_bits.
+    The longest palindromic subsequence of s is the longest common subsequence of s and its reverse.
+
+    :param s: The input string
+    :return: The minimum number of insertions needed
+    """
+    return len(s) - lcs_length_bits(s, s[::-1])
+
+def ins_to_palin_batch(strings, workers=None, chunksize=1):
+    """
+    This function calculates ins_to_palin_bits for many strings across a pool of processes.
+
+    :param strings: An iterable of input strings
+    :param workers: The number of worker processes (default: one per core)
+    :param chunksize: The number of strings sent to a worker at a time (use more for many short strings)
+    :return: A list with the minimum number of insertions for each string, in order
+    """
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(ins_to_palin_bits, strings, chunksize=chunksize))
+
+if __name__ == '__main__':
+    print(min_win_game_fast(100)[0])
+    benchmark_min_win_game()
+    word = "ujrjotvu"
+    print(ins_to_palin_linear(word), ins_to_palin_bits(word), ins_to_palin_batch([word, word[::2], "abcba"]))
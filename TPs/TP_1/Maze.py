@@ -94,12 +94,14 @@ Tree = set
 
 def edge(A, B) -> Edge: return Edge(sorted([A, B]))
 
-def random_tree(nodes, neighbors, pop=deque.pop) -> Tree:
-    """Repeat: pop a node and add edge(node, nbr) until all nodes have been added to tree."""
+def random_tree(nodes, neighbors, pop=deque.pop, frontier=deque) -> Tree:
+    """Repeat: pop a node and add edge(node, nbr) until all nodes have been added to tree.
+    The frontier is made by `frontier([root])`; if `pop` is None, the frontier's own pop method is used."""
     tree = Tree()
     nodes = set(nodes)
     root = nodes.pop()
-    frontier = deque([root])
+    frontier = frontier([root])
+    pop = pop or type(frontier).pop
     while nodes:
         node = pop(frontier)
         nbrs = neighbors(node) & nodes
@@ -135,9 +137,9 @@ def grid(width, height) -> {Square}:
     """All squares in a grid of these dimensions."""
     return {(x, y) for x in range(width) for y in range(height)}
 
-def random_maze(width, height, pop=deque.pop) -> Maze:
+def random_maze(width, height, pop=deque.pop, frontier=deque) -> Maze:
     """Generate a random maze, using random_tree."""
-    tree = random_tree(grid(width, height), neighbors4, pop)
+    tree = random_tree(grid(width, height), neighbors4, pop, frontier)
     return Maze(width, height, tree)
 
 
@@ -295,3 +297,458 @@ show(poprandom)
 
 
 # What other variations can you come up with to generate interesting mazes?
+
+
+# # Compact mazes for large grids
+# 
+# The representation above is great for reading, but it does not scale: every square is an `(x, y)` tuple in a set, `neighbors4(node) & nodes` builds two fresh sets on every step, and every edge is a tuple of tuples in another set. A 2000x2000 maze takes gigabytes of memory and minutes of time.
+# 
+# For big grids I'll keep the same algorithm but change the data:
+# 
+# - A square is an integer index `i = y * width + x` into a flat grid.
+# - A `CompactMaze` is a named tuple `(width, height, walls)`, where `walls` is an `array` of bytes with one **bitmask** per square: a bit is set if the wall on that side (`WALL_N`, `WALL_S`, `WALL_E`, `WALL_W`) is still standing.
+# - The set of nodes not yet in the tree becomes a `bytearray` of flags, `in_tree`.
+# - Knocking down a wall clears one bit in each of the two squares.
+# 
+# The `frontier` is still a `deque`, so the same `pop` strategies (`deque.pop`, `deque.popleft`, `poprandom`) work unchanged. The conversions `compact_to_maze` and `maze_to_compact` go back and forth between the two representations, so `plot_maze` and `breadth_first_search` still work on compact mazes.
+
+# In[14]:
+
+
+from array import array
+
+WALL_N, WALL_S, WALL_E, WALL_W = 1, 2, 4, 8
+ALL_WALLS = WALL_N | WALL_S | WALL_E | WALL_W
+OPPOSITE = {WALL_N: WALL_S, WALL_S: WALL_N, WALL_E: WALL_W, WALL_W: WALL_E}
+
+CompactMaze = namedtuple('CompactMaze', 'width, height, walls')
+
+def compact_moves(i, width, height) -> [(int, int)]:
+    """The (wall, neighbor) pairs for the squares next to square i that are inside the grid."""
+    y, x = divmod(i, width)
+    moves = []
+    if y > 0:          moves.append((WALL_N, i - width))
+    if y < height - 1: moves.append((WALL_S, i + width))
+    if x < width - 1:  moves.append((WALL_E, i + 1))
+    if x > 0:          moves.append((WALL_W, i - 1))
+    return moves
+
+def random_compact_maze(width, height, pop=deque.pop, frontier=deque) -> CompactMaze:
+    """Generate a random maze like random_maze does, but as per-square wall bitmasks in a flat array."""
+    n = width * height
+    walls = array('B', [ALL_WALLS]) * n
+    in_tree = bytearray(n)
+    root = random.randrange(n)
+    in_tree[root] = 1
+    frontier = frontier([root])
+    pop = pop or type(frontier).pop
+    remaining = n - 1
+    while remaining:
+        node = pop(frontier)
+        nbrs = [(wall, nbr) for (wall, nbr) in compact_moves(node, width, height) if not in_tree[nbr]]
+        if nbrs:
+            wall, nbr = random.choice(nbrs)
+            walls[node] &= ~wall
+            walls[nbr] &= ~OPPOSITE[wall]
+            in_tree[nbr] = 1
+            remaining -= 1
+            frontier.extend([node, nbr])
+    return CompactMaze(width, height, walls)
+
+def compact_to_maze(cmaze) -> Maze:
+    """Convert a CompactMaze to a Maze with a set of edges, for plot_maze and breadth_first_search."""
+    w, h, walls = cmaze
+    edges = Tree()
+    for i, bits in enumerate(walls):
+        y, x = divmod(i, w)
+        if not bits & WALL_E: edges.add(((x, y), (x + 1, y)))
+        if not bits & WALL_S: edges.add(((x, y), (x, y + 1)))
+    return Maze(w, h, edges)
+
+def maze_to_compact(maze) -> CompactMaze:
+    """Convert a Maze with a set of edges to a CompactMaze of wall bitmasks."""
+    w = maze.width
+    walls = array('B', [ALL_WALLS]) * (w * maze.height)
+    for (x1, y1), (x2, y2) in maze.edges:
+        # Edges are sorted, so the second square is either east of or south of the first one.
+        wall = WALL_E if y1 == y2 else WALL_S
+        walls[y1 * w + x1] &= ~wall
+        walls[y2 * w + x2] &= ~OPPOSITE[wall]
+    return CompactMaze(w, maze.height, walls)
+
+def as_compact(maze) -> CompactMaze:
+    """A CompactMaze for `maze`, which can be either a Maze or a CompactMaze."""
+    return maze if isinstance(maze, CompactMaze) else maze_to_compact(maze)
+
+
+# A compact maze converts to exactly the same kind of `Maze` as before, so it can be plotted and solved:
+
+# In[15]:
+
+
+C = random_compact_maze(10, 5)
+M = compact_to_maze(C)
+plot_maze(M, figsize=(5, 2.5), path=breadth_first_search(M))
+
+
+# And the conversion round-trips in both directions:
+
+# In[16]:
+
+
+M = random_maze(30, 20)
+assert compact_to_maze(maze_to_compact(M)) == M
+assert maze_to_compact(compact_to_maze(C)) == C
+
+
+# A million-square maze now takes about a megabyte for its walls (it takes a few seconds to generate, so only when Maze.py is run as a script):
+
+# In[17]:
+
+
+if __name__ == '__main__':
+    C = random_compact_maze(1000, 1000)
+    print(len(C.walls))
+
+
+# # Distance fields and repeated path queries
+# 
+# `breadth_first_search` answers one question: the path from start to goal. It also builds every path by copying its parent's list, `paths.get(s, []) + [s2]`, so memory grows with (number of squares) &times; (path length).
+# 
+# When we want to ask many "path from A to B" questions of the same maze, it is better to do one breadth-first search from a source and keep the whole **distance field**:
+# 
+# - `dist[i]` is the number of steps from the source to square `i` (or -1 if it is unreachable).
+# - `parent[i]` is the square we came from on a shortest path (or -1 for the source).
+# 
+# Both are flat integer arrays indexed like `CompactMaze.walls`. A path to any target is then read off by following `parent` pointers back to the source, which takes time proportional to the path length. Since mazes are undirected, a field from `A` also answers queries *to* `A`, by reversing the path.
+# 
+# `PathCache` keeps the most recently used fields, keyed by `(id(maze), source)`. Each entry holds on to its maze, so the `id` can't be reused by another maze while the entry is alive.
+
+# In[18]:
+
+
+from collections import OrderedDict
+
+DistanceField = namedtuple('DistanceField', 'width, height, source, dist, parent')
+
+def distance_field(cmaze, source=0) -> DistanceField:
+    """Breadth-first search from square index `source`, recording distance and parent of every square."""
+    w, h, walls = cmaze
+    n = w * h
+    dist = array('i', [-1]) * n
+    parent = array('i', [-1]) * n
+    dist[source] = 0
+    frontier = deque([source])
+    while frontier:
+        i = frontier.popleft()
+        d = dist[i] + 1
+        bits = walls[i]
+        # Walls on the border of the grid are never knocked down, so an open side always leads inside.
+        for wall, j in ((WALL_N, i - w), (WALL_S, i + w), (WALL_E, i + 1), (WALL_W, i - 1)):
+            if not bits & wall and dist[j] < 0:
+                dist[j] = d
+                parent[j] = i
+                frontier.append(j)
+    return DistanceField(w, h, source, dist, parent)
+
+def field_path(field, target) -> [Square]:
+    """The shortest path of (x, y) squares from field.source to square index `target`, or None."""
+    if field.dist[target] < 0:
+        return None
+    w, parent = field.width, field.parent
+    path = []
+    i = target
+    while i != -1:
+        path.append(Square(reversed(divmod(i, w))))
+        i = parent[i]
+    path.reverse()
+    return path
+
+class PathCache:
+    """A least-recently-used cache of distance fields, keyed by (id(maze), source)."""
+    
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.fields = OrderedDict() # {(id(maze), source): (maze, field)}
+        self.hits = self.misses = 0
+        
+    def cached(self, maze, source):
+        """The cached field for (maze, source), or None."""
+        entry = self.fields.get((id(maze), source))
+        if entry is None:
+            return None
+        self.fields.move_to_end((id(maze), source))
+        return entry[1]
+    
+    def field(self, maze, source):
+        """The distance field of `maze` (a Maze or CompactMaze) from square index `source`."""
+        field = self.cached(maze, source)
+        if field is None:
+            self.misses += 1
+            field = distance_field(as_compact(maze), source)
+            self.fields[id(maze), source] = (maze, field)
+            if len(self.fields) > self.maxsize:
+                self.fields.popitem(last=False)
+        else:
+            self.hits += 1
+        return field
+        
+    def path(self, maze, start=(0, 0), goal=None) -> [Square]:
+        """A shortest path of squares from start to goal (default: the bottom-right square), or None."""
+        w = maze.width
+        if goal is None:
+            goal = (w - 1, maze.height - 1)
+        a, b = start[1] * w + start[0], goal[1] * w + goal[0]
+        field = self.cached(maze, b)
+        if field is not None: # A field from the goal answers the reverse query.
+            self.hits += 1
+            path = field_path(field, a)
+            return path and path[::-1]
+        return field_path(self.field(maze, a), b)
+    
+paths = PathCache()
+
+
+# The cached queries give the same answer as `breadth_first_search`, and asking again (in either direction) does not search again:
+
+# In[19]:
+
+
+C = random_compact_maze(70, 70)
+M = compact_to_maze(C)
+solution = breadth_first_search(M)
+assert paths.path(C) == solution
+assert paths.path(C, (69, 69), (0, 0)) == solution[::-1]
+assert len(paths.path(C, (0, 0), (35, 35))) == paths.field(C, 0).dist[35 * 70 + 35] + 1
+paths.hits, paths.misses
+
+
+# # Faster plotting
+# 
+# `plot_maze` checks every square against every neighbor, rebuilding `maze.edges | exits` along the way, and calls `plt.plot` once per wall. For the 70x70 mazes of `show` that is already about ten thousand separate lines, and it gets unusable beyond that.
+# 
+# With the wall bitmasks of a `CompactMaze` we can find all the walls at once with NumPy. Each square draws its north and west walls; the squares in the last column also draw their east wall, and the squares in the last row their south wall. That way every wall is drawn exactly once. `wall_segments` returns all of them as one array of `((x0, y0), (x1, y1))` segments, and `plot_maze_fast` draws them as a single `LineCollection`.
+# 
+# For really big mazes even one collection of millions of lines is too much for `matplotlib`, so `raster_maze` paints the maze straight into a pixel buffer and saves it as a PNG. In the buffer each square is a white pixel at `(2y + 1, 2x + 1)`, and the pixels in between are black when there is a wall there. Both functions take the same optional solution `path` as `plot_maze`.
+
+# In[20]:
+
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+WALL_SIDES = {WALL_N: (0, 0, 1, 0), WALL_S: (0, 1, 1, 1), WALL_E: (1, 0, 1, 1), WALL_W: (0, 0, 0, 1)}
+
+def wall_bits(cmaze) -> np.ndarray:
+    """The walls of a CompactMaze as a (height, width) array of bitmasks, with the entrance and exit open."""
+    w, h = cmaze.width, cmaze.height
+    bits = np.frombuffer(cmaze.walls, dtype=np.uint8).reshape(h, w).copy()
+    bits[0, 0] &= ~WALL_N & ALL_WALLS
+    bits[h - 1, w - 1] &= ~WALL_S & ALL_WALLS
+    return bits
+
+def wall_segments(cmaze) -> np.ndarray:
+    """All the walls of a CompactMaze, drawn once each, as an array of ((x0, y0), (x1, y1)) segments."""
+    bits = wall_bits(cmaze)
+    draw = bits & (WALL_N | WALL_W)
+    draw[:, -1] |= bits[:, -1] & WALL_E
+    draw[-1, :] |= bits[-1, :] & WALL_S
+    segments = []
+    for wall, (x0, y0, x1, y1) in WALL_SIDES.items():
+        ys, xs = np.nonzero(draw & wall)
+        segments.append(np.stack([xs + x0, ys + y0, xs + x1, ys + y1], axis=1))
+    return np.concatenate(segments).reshape(-1, 2, 2)
+
+def plot_maze_fast(maze, figsize=None, path=None):
+    """Plot a maze (a Maze or CompactMaze) like plot_maze does, but with all walls in one LineCollection."""
+    cmaze = as_compact(maze)
+    w, h = cmaze.width, cmaze.height
+    plt.figure(figsize=figsize or (w/5, h/5))
+    plt.axis('off')
+    ax = plt.gca()
+    ax.add_collection(LineCollection(wall_segments(cmaze), colors='k', linewidths=2))
+    ax.set_xlim(0, w)
+    ax.set_ylim(h, 0)
+    if path: # Plot the solution (or any path) as a red line through the maze
+        X, Y = transpose((x + 0.5, y + 0.5) for (x, y) in path)
+        plt.plot(X, Y, 'r-', linewidth=2)
+
+def raster_maze(maze, filename, path=None, scale=2):
+    """Paint a maze (a Maze or CompactMaze) into a pixel buffer and save it as a PNG file."""
+    cmaze = as_compact(maze)
+    w, h = cmaze.width, cmaze.height
+    bits = wall_bits(cmaze)
+    wall = np.ones((2 * h + 1, 2 * w + 1), dtype=bool)
+    wall[1::2, 1::2] = False
+    wall[1::2, 2:2 * w:2] = (bits[:, :-1] & WALL_E) != 0
+    wall[2:2 * h:2, 1::2] = (bits[:-1, :] & WALL_S) != 0
+    wall[0, 1] = (bits[0, 0] & WALL_N) != 0
+    wall[2 * h, 2 * w - 1] = (bits[h - 1, w - 1] & WALL_S) != 0
+    pixels = np.where(wall[..., None], np.uint8(0), np.uint8(255)).repeat(3, axis=2)
+    if path: # Paint the squares of the path, and the gaps between them, red
+        X, Y = (np.array(a) for a in transpose(path))
+        rows = np.concatenate([2 * Y + 1, Y[:-1] + Y[1:] + 1])
+        cols = np.concatenate([2 * X + 1, X[:-1] + X[1:] + 1])
+        inside = (0 <= rows) & (rows <= 2 * h) & (0 <= cols) & (cols <= 2 * w)
+        pixels[rows[inside], cols[inside]] = (255, 0, 0)
+    pixels = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
+    plt.imsave(filename, pixels)
+
+
+# Here is the 10x5 maze from before, plotted in one go, and a 200x200 maze with its solution, saved as a PNG in the temporary directory (`raster_maze` handles 1000x1000 mazes just as well, in a few seconds):
+
+# In[21]:
+
+
+C = random_compact_maze(10, 5)
+M = compact_to_maze(C)
+plot_maze_fast(C, figsize=(5, 2.5), path=breadth_first_search(M))
+
+
+# In[22]:
+
+
+import os
+import tempfile
+
+C = random_compact_maze(200, 200)
+raster_maze(C, os.path.join(tempfile.gettempdir(), 'maze.png'), path=[(0, -1)] + paths.path(C) + [(C.width - 1, C.height)])
+
+
+# # Saving and loading mazes
+# 
+# So far the only way to get the same maze twice is to run the generator again with the same random seed. When one big maze is reused across many solver runs, it is better to save it once. The file format is simple and versioned:
+# 
+# - A 24-byte header (`MAZE_HEADER`): the magic bytes `b'MAZE'`, the format version, the header size, the `width` and `height`, and the random `seed` the maze was made with (0 if unknown).
+# - Then the wall bitmap: the `walls` of the `CompactMaze`, one byte of wall bits per square, in square-index order.
+# 
+# I keep a whole byte per square (rather than packing the bits tighter) so that `load_maze` doesn't have to decode anything: it memory-maps the file and hands back a `CompactMaze` whose `walls` is a read-only view straight into the mapping. Opening takes constant time whatever the size of the maze, the operating system pages walls in only as they are read, and `distance_field`, `PathCache`, `plot_maze_fast` and `raster_maze` all work on it without ever building an edge set.
+
+# In[23]:
+
+
+import mmap
+import struct
+
+MAZE_MAGIC = b'MAZE'
+MAZE_FORMAT_VERSION = 1
+MAZE_HEADER = struct.Struct('<4sHHIIQ') # magic, version, header size, width, height, seed
+
+def save_maze(maze, filename, seed=0):
+    """Save a maze (a Maze or CompactMaze) to a binary maze file."""
+    cmaze = as_compact(maze)
+    with open(filename, 'wb') as f:
+        f.write(MAZE_HEADER.pack(MAZE_MAGIC, MAZE_FORMAT_VERSION, MAZE_HEADER.size, 
+                                 cmaze.width, cmaze.height, seed))
+        f.write(cmaze.walls)
+
+def load_maze(filename) -> (CompactMaze, int):
+    """Memory-map a binary maze file; return the CompactMaze and the seed it was made with."""
+    with open(filename, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, size, w, h, seed = MAZE_HEADER.unpack_from(mapping)
+    if magic != MAZE_MAGIC:
+        raise ValueError(f'{filename} is not a maze file')
+    if version > MAZE_FORMAT_VERSION:
+        raise ValueError(f'{filename} has maze format version {version}; only up to {MAZE_FORMAT_VERSION} is supported')
+    if len(mapping) < size + w * h:
+        raise ValueError(f'{filename} is truncated')
+    return CompactMaze(w, h, memoryview(mapping)[size:size + w * h]), seed
+
+
+# Save a seeded maze (in the temporary directory), load it back, and solve it straight from the mapped file:
+
+# In[24]:
+
+
+random.seed(42)
+C = random_compact_maze(300, 200)
+maze_file = os.path.join(tempfile.gettempdir(), 'maze42.maze')
+save_maze(C, maze_file, seed=42)
+C2, seed = load_maze(maze_file)
+assert seed == 42 and list(C2.walls) == list(C.walls)
+assert paths.path(C2) == paths.path(C)
+
+
+# # Constant-time frontiers
+# 
+# `poprandom` does `random.choice(seq)` and then `seq.remove(element)` on a `deque`, and `remove` has to search for the element, so each pop takes time proportional to the size of the frontier. That makes `random_maze(..., pop=poprandom)` quadratic in the number of squares.
+# 
+# To fix that, `random_tree` (and `random_compact_maze`) now also take a `frontier` argument: a function that makes the frontier from a list holding the root. It defaults to `deque`, so nothing changes for the `pop` functions above. If `pop` is `None`, the frontier's own `pop` method is used, and that lets a frontier class bring its own strategy:
+# 
+# - `RandomFrontier` is a `list` whose `pop` picks a random index, swaps that element with the last one, and pops the end. The order of the frontier doesn't matter, so that is a constant-time random pop.
+# - `GrowingTreeFrontier` mixes the two strategies that make the most interesting mazes: with probability `newest` it pops the newest node (like `deque.pop`), otherwise a random one (like `poprandom`). This is the "growing tree" algorithm; `growing_tree(newest)` makes a `frontier` argument for a given ratio.
+
+# In[25]:
+
+
+class RandomFrontier(list):
+    """A frontier whose pop removes a random element in constant time, by swapping it to the end."""
+    
+    def pop(self):
+        i = random.randrange(len(self))
+        self[i], self[-1] = self[-1], self[i]
+        return list.pop(self)
+    
+class GrowingTreeFrontier(RandomFrontier):
+    """A frontier that pops the newest element with probability `newest`, and otherwise a random element."""
+    
+    def __init__(self, items=(), newest=0.5):
+        super().__init__(items)
+        self.newest = newest
+        
+    def pop(self):
+        if random.random() < self.newest:
+            return list.pop(self)
+        return super().pop()
+    
+def growing_tree(newest) -> callable:
+    """A `frontier` argument for random_tree that makes a GrowingTreeFrontier with this ratio."""
+    return lambda items: GrowingTreeFrontier(items, newest)
+
+
+# A growing tree that picks the newest node 3 times out of 4 is almost as twisty as `deque.pop`, but with more short side branches:
+
+# In[26]:
+
+
+C = random_compact_maze(30, 20, pop=None, frontier=growing_tree(0.75))
+plot_maze_fast(C, path=[(0, -1)] + paths.path(C) + [(C.width - 1, C.height)])
+
+
+# # Benchmarking the strategies
+# 
+# `benchmark_strategies` times the generation of square mazes of increasing size with each strategy. The strategies are given as keyword arguments for the maze generator (`random_maze` or `random_compact_maze`). Times are in seconds.
+
+# In[27]:
+
+
+import time
+
+STRATEGIES = {
+    'deque.pop':         dict(pop=deque.pop),
+    'deque.popleft':     dict(pop=deque.popleft),
+    'poprandom':         dict(pop=poprandom),
+    'RandomFrontier':    dict(pop=None, frontier=RandomFrontier),
+    'growing_tree(0.5)': dict(pop=None, frontier=growing_tree(0.5)),
+    'growing_tree(0.9)': dict(pop=None, frontier=growing_tree(0.9))}
+
+def benchmark_strategies(sizes=(50, 100, 200, 400), maker=random_compact_maze, strategies=STRATEGIES) -> dict:
+    """Print and return {strategy: [seconds to make a size x size maze, for each size]}."""
+    times = {}
+    print(f'{"strategy":>18}', *(f'{f"{n}x{n}":>10}' for n in sizes))
+    for name, kwargs in strategies.items():
+        times[name] = []
+        for n in sizes:
+            start = time.perf_counter()
+            maker(n, n, **kwargs)
+            times[name].append(time.perf_counter() - start)
+        print(f'{name:>18}', *(f'{t:10.3f}' for t in times[name]))
+    return times
+
+
+# In[28]:
+
+
+if __name__ == '__main__': # not when Maze is imported: poprandom is quadratic, so this takes a while
+    benchmark_strategies()
@@ -0,0 +1,333 @@
+# Benchmark and profiling suite for the plain-Python modules of the repository (TPs/TP_1/Maze.py and Quizzes/Quizz_*.py).
+
+# Every benchmark runs on seeded random inputs at three scales (small, medium and large), so two runs measure the same work.
+# For each benchmark and scale it records the wall time (best and mean of some repetitions), the peak memory allocated
+# during one call (tracemalloc) and the functions where one profiled call spends most of its own time (cProfile), in JSON.
+# The inputs are made before each call, outside the measurements.
+
+# python benchmark.py run -o before.json                           # all benchmarks at all scales
+# python benchmark.py run --only Quizz_4 --scales small medium     # benchmarks whose name contains 'Quizz_4'
+# python benchmark.py compare before.json after.json               # exit status 1 if anything got slower or bigger
+
+from collections import namedtuple
+from functools import cache
+import argparse
+import ast
+import contextlib
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MAZE = os.path.join(ROOT, 'TPs', 'TP_1', 'Maze.py')
+QUIZZES = os.path.join(ROOT, 'Quizzes')
+SCALES = ('small', 'medium', 'large')
+
+# Loading the modules
+
+def load_definitions(file_name, name):
+    """
+    This function loads the imports, functions, classes and constants of a script exported from a notebook,
+    skipping the cells that plot or run examples (Maze.py calls get_ipython and draws mazes at the top level).
+
+    :param file_name: The script to load
+    :param name: The name of the new module
+    :return: A module with the definitions of the script
+    """
+    with open(file_name, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), file_name)
+    functions = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)}
+
+    def keep(node):
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            return True
+        if isinstance(node, (ast.Import, ast.ImportFrom)):  # matplotlib is only needed to draw
+            modules = [node.module or ''] if isinstance(node, ast.ImportFrom) else [alias.name for alias in node.names]
+            return not any(module.startswith('matplotlib') for module in modules)
+        if isinstance(node, ast.Assign):  # constants and types (eg Maze = namedtuple(...)), but not M = random_maze(10, 5)
+            targets = [name for target in node.targets for name in getattr(target, 'elts', [target])]
+            names = all(isinstance(target, ast.Name) and target.id[0].isupper() for target in targets)
+            example = (isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Name)
+                       and node.value.func.id in functions)
+            return names and not example
+        return False
+
+    module = type(sys)(name)
+    module.__file__ = file_name
+    code = compile(ast.Module([node for node in tree.body if keep(node)], type_ignores=[]), file_name, 'exec')
+    exec(code, module.__dict__)
+    return module
+
+@cache
+def load(name):
+    """
+    This function loads a module of the repository once: 'Maze' or one of the quizzes (their examples are silenced).
+
+    :param name: 'Maze', 'Quizz_1', 'Quizz_2', 'Quizz_3' or 'Quizz_4'
+    :return: The module
+    """
+    if name == 'Maze':
+        return load_definitions(MAZE, name)
+    if QUIZZES not in sys.path:
+        sys.path.insert(0, QUIZZES)
+    with contextlib.redirect_stdout(io.StringIO()):  # the quizzes print their examples when imported
+        return __import__(name)
+
+# Seeded input generators: each one receives the size, a random.Random and a temporary directory,
+# and returns the arguments of the function
+
+def maze_size(n, rnd, directory):
+    return n, n
+
+def made_maze(n, rnd, directory):
+    random.seed(rnd.random())  # random_maze uses the random module
+    return load('Maze').random_maze(n, n),
+
+def made_compact_maze(n, rnd, directory):
+    random.seed(rnd.random())
+    return load('Maze').random_compact_maze(n, n),
+
+def integer(n, rnd, directory):
+    return n,
+
+def maze_file(n, rnd, directory, walls=0.2):
+    """
+    This function writes an n x n maze for Quizz_2 (about 20% walls, S and E in random squares).
+
+    :return: The name of the file
+    """
+    grid = [['#' if rnd.random() < walls else '.' for _ in range(n)] for _ in range(n)]
+    start, end = rnd.sample(range(n * n), 2)
+    grid[start // n][start % n] = 'S'
+    grid[end // n][end % n] = 'E'
+    file_name = os.path.join(directory, f'maze_{n}.txt')
+    with open(file_name, 'w') as f:
+        f.write(f'{n} {n}\n' + '\n'.join(''.join(row) for row in grid) + '\n')
+    return file_name,
+
+def tasks_teams(n, rnd, directory):
+    return [rnd.randint(1, 10**6) for _ in range(n)], [rnd.randint(1, 10**6) for _ in range(n)]
+
+def intervals(n, rnd, directory):
+    return [sorted((rnd.randint(0, 10**7), rnd.randint(0, 10**7))) for _ in range(n)],
+
+def letters(n, rnd, directory):
+    return ''.join(rnd.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(n)),
+
+def palindrome_letters(n, rnd, directory):
+    return ''.join(rnd.choice('abcd') for _ in range(n)),
+
+def consume(function):
+    """
+    This function makes a version of a generator function that returns the number of items it yields.
+    """
+    def count(*args):
+        return sum(1 for _ in function(*args))
+    count.__name__ = function.__name__
+    return count
+
+# module, function, input generator and the sizes for the small, medium and large scales
+Benchmark = namedtuple('Benchmark', 'module, function, make, sizes')
+
+BENCHMARKS = {
+    'Maze.random_maze':                      Benchmark('Maze', 'random_maze', maze_size, (20, 50, 100)),
+    'Maze.random_compact_maze':              Benchmark('Maze', 'random_compact_maze', maze_size, (20, 50, 100)),
+    'Maze.breadth_first_search':             Benchmark('Maze', 'breadth_first_search', made_maze, (20, 50, 100)),
+    'Maze.distance_field':                   Benchmark('Maze', 'distance_field', made_compact_maze, (20, 50, 100)),
+    'Quizz_1.sum_powers':                    Benchmark('Quizz_1', 'sum_powers', integer, (200, 400, 600)),
+    'Quizz_1.iter_sum_powers':               Benchmark('Quizz_1', 'iter_sum_powers', integer, (200, 400, 600)),
+    'Quizz_1.count_sum_powers':              Benchmark('Quizz_1', 'count_sum_powers', integer, (200, 400, 600)),
+    'Quizz_2.solve':                         Benchmark('Quizz_2', 'solve', maze_file, (50, 150, 300)),
+    'Quizz_2.solve_fast':                    Benchmark('Quizz_2', 'solve_fast', maze_file, (50, 150, 300)),
+    'Quizz_3.max_tasks':                     Benchmark('Quizz_3', 'max_tasks', tasks_teams, (10**3, 10**4, 10**5)),
+    'Quizz_3.min_lazer_shots':               Benchmark('Quizz_3', 'min_lazer_shots', intervals, (10**3, 10**4, 10**5)),
+    'Quizz_3.smallest_unique_letters':       Benchmark('Quizz_3', 'smallest_unique_letters', letters, (10**3, 10**4, 10**5)),
+    'Quizz_3.smallest_unique_letters_fast':  Benchmark('Quizz_3', 'smallest_unique_letters_fast', letters, (10**3, 10**4, 10**5)),
+    'Quizz_4.ins_to_palin':                  Benchmark('Quizz_4', 'ins_to_palin', palindrome_letters, (100, 300, 600)),
+    'Quizz_4.ins_to_palin_bits':             Benchmark('Quizz_4', 'ins_to_palin_bits', palindrome_letters, (100, 300, 600)),
+    'Quizz_4.min_win_game':                  Benchmark('Quizz_4', 'min_win_game', integer, (50, 100, 200)),
+    'Quizz_4.min_win_game_fast':             Benchmark('Quizz_4', 'min_win_game_fast', integer, (50, 100, 200)),
+}
+
+# Measuring
+
+def function_of(benchmark):
+    function = getattr(load(benchmark.module), benchmark.function)
+    if benchmark.function.startswith('iter_'):
+        return consume(function)
+    return function
+
+def hot_spots(profile, top):
+    """
+    This function lists the functions where a profiled call spent most of its own time.
+
+    :param profile: A cProfile.Profile that ran the call
+    :param top: The number of functions to list
+    :return: A list of dicts with the function (file:line(name)), number of calls, own time and cumulative time
+    """
+    stats = pstats.Stats(profile).stats
+    spots = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [{'function': f'{os.path.relpath(file, ROOT) if file.startswith(ROOT + os.sep) else file}:{line}({name})',
+             'calls': calls, 'own_seconds': round(own, 6), 'cumulative_seconds': round(cumulative, 6)}
+            for (file, line, name), (_, calls, own, cumulative, _) in spots]
+
+def measure(benchmark, size, seed=0, repeat=5, top=10, directory=None):
+    """
+    This function measures one benchmark at one size.
+
+    :param benchmark: A Benchmark
+    :param size: The size of the input
+    :param seed: The seed of the input generator (the same seed makes the same input)
+    :param repeat: The number of timed calls
+    :param top: The number of hot spots to keep
+    :param directory: A directory for input files
+    :return: A dict with the wall times (best and mean), the peak memory of one call and its hot spots
+    """
+    function = function_of(benchmark)
+
+    def arguments():  # a new input for each call, since some functions sort their input in place
+        random.seed(seed)
+        return benchmark.make(size, random.Random(seed), directory)
+
+    times = []
+    for _ in range(repeat):
+        args = arguments()
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+
+    args = arguments()
+    tracemalloc.start()
+    try:
+        function(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    args = arguments()
+    profile = cProfile.Profile()
+    profile.runcall(function, *args)
+
+    return {'size': size, 'seconds': round(min(times), 6), 'mean_seconds': round(sum(times) / repeat, 6),
+            'peak_bytes': peak, 'result': summary(result), 'hot_spots': hot_spots(profile, top)}
+
+def summary(result):
+    """
+    This function describes a result in a few characters, to check that two runs computed the same thing.
+    """
+    if isinstance(result, (int, float, str)) and len(str(result)) <= 40:
+        return result
+    if isinstance(result, (list, tuple, set, dict)):
+        return f'{type(result).__name__} of {len(result)}'
+    return type(result).__name__
+
+def run_suite(names=None, scales=SCALES, seed=0, repeat=5, top=10, output=sys.stdout):
+    """
+    This function runs the benchmarks, printing one line per benchmark and scale.
+
+    :param names: Substrings of the names of the benchmarks to run (default: all)
+    :param scales: The scales to run
+    :param seed: The seed of the input generators
+    :param repeat: The number of timed calls of each benchmark
+    :param top: The number of hot spots to keep
+    :param output: Where to print the progress
+    :return: A dict with the environment and the results, ready to be saved as JSON
+    """
+    report = {'python': platform.python_version(), 'platform': platform.platform(),
+              'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seed': seed, 'repeat': repeat, 'results': []}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, benchmark in BENCHMARKS.items():
+            if names and not any(part in name for part in names):
+                continue
+            for scale, size in zip(SCALES, benchmark.sizes):
+                if scale not in scales:
+                    continue
+                result = {'benchmark': name, 'scale': scale}
+                result.update(measure(benchmark, size, seed, repeat, top, directory))
+                report['results'].append(result)
+                print(f"{name:>38} {scale:>6} {size:>7}: {result['seconds']:9.4f}s "
+                      f"{result['peak_bytes'] / 2**20:9.2f} MB   {result['hot_spots'][0]['function']}", file=output)
+    return report
+
+# Comparing two runs
+
+def compare(before, after, time_threshold=0.10, memory_threshold=0.10, min_seconds=0.001, output=sys.stdout):
+    """
+    This function compares two reports of run_suite, benchmark by benchmark.
+    A benchmark regressed if its best time grew more than time_threshold (and at least min_seconds, to ignore
+    the noise of very fast calls) or its peak memory grew more than memory_threshold.
+
+    :param before: The report of the first run
+    :param after: The report of the second run
+    :return: A list of (benchmark, scale, what regressed) for the regressions
+    """
+    old = {(r['benchmark'], r['scale']): r for r in before['results']}
+    regressions = []
+    print(f"{'benchmark':>38} {'scale':>6} {'before':>10} {'after':>10} {'time':>7} {'memory':>7}", file=output)
+    for r in after['results']:
+        key = (r['benchmark'], r['scale'])
+        if key not in old:
+            print(f'{key[0]:>38} {key[1]:>6}   (new)', file=output)
+            continue
+        o = old.pop(key)
+        time_ratio = r['seconds'] / o['seconds'] if o['seconds'] else 1
+        memory_ratio = r['peak_bytes'] / o['peak_bytes'] if o['peak_bytes'] else 1
+        flags = []
+        if time_ratio > 1 + time_threshold and r['seconds'] - o['seconds'] >= min_seconds:
+            flags.append('time')
+        if memory_ratio > 1 + memory_threshold:
+            flags.append('memory')
+        if r['size'] != o['size'] or r['result'] != o['result']:
+            flags.append('input or result changed')
+        if flags:
+            regressions.append((*key, ', '.join(flags)))
+        print(f"{key[0]:>38} {key[1]:>6} {o['seconds']:9.4f}s {r['seconds']:9.4f}s {time_ratio:6.2f}x {memory_ratio:6.2f}x"
+              f"{'   <- ' + ', '.join(flags) if flags else ''}", file=output)
+    for key in old:
+        print(f'{key[0]:>38} {key[1]:>6}   (missing)', file=output)
+    print(f'{len(regressions)} regression(s)', file=output)
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark and profile the maze and quiz algorithms.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run the benchmarks and save the results as JSON')
+    run.add_argument('-o', '--output', help='JSON output file (default: standard output)')
+    run.add_argument('--only', nargs='+', help='run only the benchmarks whose name contains one of these')
+    run.add_argument('--scales', nargs='+', choices=SCALES, default=SCALES, help='scales to run (default: all)')
+    run.add_argument('--seed', type=int, default=0, help='seed of the input generators (default: 0)')
+    run.add_argument('--repeat', type=int, default=5, help='timed calls of each benchmark (default: 5)')
+    run.add_argument('--top', type=int, default=10, help='hot spots kept for each benchmark (default: 10)')
+    run.add_argument('--list', action='store_true', help='list the benchmarks and their sizes, without running them')
+    diff = commands.add_parser('compare', help='compare two JSON results, flagging regressions')
+    diff.add_argument('before')
+    diff.add_argument('after')
+    diff.add_argument('--time-threshold', type=float, default=0.10, help='allowed relative growth of the time (default: 0.10)')
+    diff.add_argument('--memory-threshold', type=float, default=0.10, help='allowed relative growth of the memory (default: 0.10)')
+    diff.add_argument('--min-seconds', type=float, default=0.001, help='ignore time growths smaller than this (default: 0.001)')
+    args = parser.parse_args()
+
+    if args.command == 'run' and args.list:
+        for name, benchmark in BENCHMARKS.items():
+            print(f'{name:>38}', *(f'{scale}={size}' for scale, size in zip(SCALES, benchmark.sizes)))
+    elif args.command == 'run':
+        progress = sys.stderr if args.output is None else sys.stdout
+        report = run_suite(args.only, args.scales, args.seed, args.repeat, args.top, progress)
+        if args.output:
+            with open(args.output, 'w') as output:
+                json.dump(report, output, indent=1)
+        else:
+            json.dump(report, sys.stdout, indent=1)
+    else:
+        with open(args.before) as before, open(args.after) as after:
+            regressions = compare(json.load(before), json.load(after), args.time_threshold,
+                                  args.memory_threshold, args.min_seconds)
+        sys.exit(1 if regressions else 0)